@@ -0,0 +1,6 @@
+#coding=utf8
+"""pyab 公共部分：结果统计、请求来源、报告输出与引擎注册表"""
+
+from abcore.stats import Result, ResultStats
+from abcore.engine import Engine, register, get_engine
+from abcore.bench import ApacheBench
@@ -0,0 +1,77 @@
+#coding=utf8
+"""apache bench 控制类，与具体引擎无关"""
+
+import signal
+import time
+
+from abcore.producer import expand, interleave
+from abcore.report import print_replay_report, print_report, print_session_report
+from abcore.stats import ResultStats
+
+
+class ApacheBench(object):
+    """apache bench 控制类
+    
+    Attributes:
+        engine: 引擎实例
+        n: number  of requests to perform for the benchmarking session (per url), None for no limit
+        t: timelimit, Maximum  number of seconds to spend for benchmarking.
+           Use this to benchmark the server within a fixed total amount of time. Per default there is no timelimit.
+           Only requests completed within the timelimit are reported.
+        urls: url列表，两个url时为 A/B 对比模式，url 可以是模板；
+              engine.script 不为 None 时不使用
+        params: url 模板参数 {name: UrlParam}
+        ring_size: url 模板展开后的环长度，见 producer.expand
+        replay: 不为 None 时按该 TraceReplay 的原始时间回放，不使用 urls
+    """
+
+    def __init__(self, urls, engine, n=1, t=None, params=None, ring_size=None,
+                 replay=None):
+        self.engine = engine
+        self.n = n
+        self.t = t
+        self.urls = urls
+        self.params = params or {}
+        self.ring_size = ring_size
+        self.replay = replay
+
+    def stop_processing(self, _signal, _frame):
+        print 'STOP'
+        self.engine.stop()
+
+    def start(self):
+        
+        script = self.engine.script
+        if self.replay is not None:
+            source = self.replay.items(self.n, self.engine.sleep)
+            targets = [self.replay.path]
+        elif script is not None:
+            # VirtualUser 自己决定下一步，请求来源只控制请求数
+            source = interleave([[None]], self.n)
+            targets = script.steps
+        else:
+            rings = [expand(url, self.params, self.ring_size, n=self.n)
+                     for url in self.urls]
+            source = interleave(rings, self.n)
+            targets = self.urls
+
+        print 'Benchmarking (be patient).....'
+
+        signal.signal(signal.SIGINT, self.stop_processing)
+
+        all_stats = [ResultStats() for _ in targets]
+        start = time.time()
+        self.engine.run(source, all_stats, duration=self.t)
+
+        # 截止或停止之后完成的请求已被丢弃，按统计窗口计算
+        total = self.engine.stopped_at - start
+        if script is not None:
+            # 稳态统计从第一个虚拟用户完成 setup 起算
+            steady_since = self.engine.steady_since or self.engine.stopped_at
+            print_session_report(script, all_stats, self.engine.c,
+                                 max(0, self.engine.stopped_at - steady_since),
+                                 min(total, steady_since - start))
+        else:
+            print_report(targets, all_stats, self.engine.c, total)
+        if self.replay is not None:
+            print_replay_report(self.replay)
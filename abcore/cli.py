@@ -0,0 +1,118 @@
+#coding=utf8
+"""命令行入口，pyab.py 与 gevent_ab.py 共用"""
+
+import urlparse
+from optparse import OptionParser
+
+from abcore import engines
+from abcore.bench import ApacheBench
+from abcore.engine import ENGINES, get_engine
+from abcore.producer import UrlParam, template_fields
+from abcore.replay import TraceReplay
+from abcore.session import SessionScript
+
+
+def main(engine='auto'):
+    """
+    args:
+        engine: --engine 的默认值
+    """
+    usage = "usage: %prog [options] url(s)"
+    parser = OptionParser(usage=usage)
+    parser.add_option('-c', None, dest='c', type='int', default=1,
+                      help='number of concurrent requests')
+    parser.add_option('-n', None, dest='n', type='int', default=None,
+                      help='total number of requests [default: 1, '
+                           'unlimited with -t or --replay]')
+    parser.add_option('-t', None, dest='t', type='int', default=None,
+                      help='timelimit, Maximum number\
+                      of seconds to spend for benchmarking')
+    parser.add_option('--compare', dest='compare', nargs=2, type='string',
+                      metavar='URL_A URL_B',
+                      help='interleave -n requests to each of two urls and compare them')
+    parser.add_option('--validate', dest='validate', action='store_true',
+                      default=False,
+                      help='count response bytes in python callbacks (slower)')
+    parser.add_option('--unix-socket', dest='unix_socket', metavar='PATH',
+                      default=None,
+                      help='connect through this unix domain socket')
+    parser.add_option('--param', dest='params', action='append', default=[],
+                      metavar='NAME=SPEC',
+                      help='values for {NAME} in the url: range:START:END, '
+                           'uniform:START:END, zipf:START:END[:S] or file:PATH')
+    parser.add_option('--ring-size', dest='ring_size', type='int', default=None,
+                      help='number of urls pre-expanded from a url template '
+                           '[default: -n, or 10000 without -n; at most 1000000]')
+    parser.add_option('--session', dest='session', metavar='FILE', default=None,
+                      help='run virtual users from a JSON session script '
+                           'instead of fetching a url')
+    parser.add_option('--replay', dest='replay', metavar='FILE', default=None,
+                      help='replay GET requests from an access log or jsonl '
+                           'trace with their original timing')
+    parser.add_option('--replay-base', dest='replay_base', metavar='URL',
+                      default=None,
+                      help='url prefix for relative paths in the replay trace')
+    parser.add_option('--replay-speed', dest='replay_speed', type='float',
+                      default=1.0,
+                      help='replay speed-up factor [default: %default]')
+    parser.add_option('--engine', dest='engine', type='choice', default=engine,
+                      choices=['auto'] + sorted(ENGINES),
+                      help='request engine: auto, %s [default: %%default]' % (
+                          ', '.join(sorted(ENGINES)),))
+    (options, args) = parser.parse_args()
+    script = replay = None
+    if options.replay:
+        if args or options.compare or options.session:
+            parser.error('--replay takes no URL(s)')
+        try:
+            replay = TraceReplay(options.replay, options.replay_base,
+                                 options.replay_speed)
+        except (ValueError, IOError), e:
+            parser.error(str(e))
+        urls = []
+    elif options.session:
+        if args or options.compare:
+            parser.error('--session takes no URL(s)')
+        try:
+            script = SessionScript.load(options.session)
+        except (ValueError, IOError), e:
+            parser.error(str(e))
+        urls = []
+    elif options.compare:
+        if args:
+            parser.error('--compare takes no extra URL(s)')
+        urls = list(options.compare)
+    elif len(args) == 1:
+        urls = args
+    else:
+        parser.error('need one  URL(s)')
+    if options.n is None and not options.t and replay is None:
+        options.n = 1
+    for url in urls:
+        judge_url = urlparse.urlparse(url)
+        if judge_url.scheme != "http" and judge_url.scheme != "https":
+            parser.error("need the right URL(s)")
+    try:
+        params = dict((p.name, p) for p in map(UrlParam.parse, options.params))
+    except (ValueError, IOError), e:
+        parser.error(str(e))
+    for url in urls:
+        try:
+            missing = template_fields(url, params) - set(params)
+        except ValueError, e:
+            parser.error(str(e))
+        if missing:
+            parser.error('no --param for %s' % (', '.join(sorted(missing)),))
+    try:
+        engine_cls = get_engine(options.engine)
+    except ValueError, e:
+        parser.error(str(e))
+    try:
+        engine = engine_cls(c=options.c, validate=options.validate,
+                            unix_socket=options.unix_socket, script=script)
+    except ValueError, e:
+        parser.error(str(e))
+    bench = ApacheBench(urls, engine, n=options.n, t=options.t,
+                        params=params, ring_size=options.ring_size,
+                        replay=replay)
+    bench.start()
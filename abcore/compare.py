@@ -0,0 +1,149 @@
+#coding=utf8
+"""A/B 对比模式的统计检验与报告
+
+两个目标的请求交替发送，各自的结果分别汇总到独立的 ResultStats，
+最后对总耗时做 Mann-Whitney U 检验，并用 bootstrap 估计 p50/p99 差值的置信区间。
+"""
+
+from __future__ import division
+import math
+import random
+
+# 对比时统计的分位点
+COMPARE_PERCENTILES = (50, 99)
+# bootstrap 时每个目标最多使用的样本数
+MAX_BOOTSTRAP_SAMPLES = 5000
+
+
+def percentile(sorted_data, p):
+    """与 ResultStats.distribution 相同的取点方式"""
+    n = len(sorted_data)
+    i = p/100 * n
+    i = n-1 if i >= n else int(i)
+    return sorted_data[i]
+
+
+def mann_whitney(a, b):
+    """Mann-Whitney U 检验（正态近似，含并列修正）
+
+    return: (u, z, p) p 为双侧p值，z < 0 表示 b 整体偏大
+    """
+    n1, n2 = len(a), len(b)
+    merged = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    n = n1 + n2
+    rank_sum_a = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and merged[j + 1][0] == merged[i][0]:
+            j += 1
+        # 并列值取平均秩
+        rank = (i + j) / 2 + 1
+        count = j - i + 1
+        tie_term += count ** 3 - count
+        for k in xrange(i, j + 1):
+            if merged[k][1] == 0:
+                rank_sum_a += rank
+        i = j + 1
+    u = rank_sum_a - n1 * (n1 + 1) / 2
+    mean_u = n1 * n2 / 2
+    var_u = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0
+    if var_u <= 0:
+        return u, 0.0, 1.0
+    z = (u - mean_u) / math.sqrt(var_u)
+    p = math.erfc(abs(z) / math.sqrt(2))
+    return u, z, p
+
+
+def bootstrap_ci(a, b, percentiles, iterations=500, confidence=0.95,
+                 max_samples=MAX_BOOTSTRAP_SAMPLES):
+    """bootstrap 估计 B 与 A 在各分位点上差值的置信区间
+
+    每轮只重抽样一次，所有分位点共用同一次重抽样。样本多于 max_samples 时
+    先无放回抽取 max_samples 个再做 bootstrap（m out of n），区间宽度按
+    sqrt(m/n) 缩放回全样本。
+
+    return: {p: (diff, low, high)} 单位与输入相同
+    """
+    sa, sb = sorted(a), sorted(b)
+    rand = random.Random(0)
+    m1, m2 = min(len(a), max_samples), min(len(b), max_samples)
+    sub_a = a if m1 == len(a) else rand.sample(a, m1)
+    sub_b = b if m2 == len(b) else rand.sample(b, m2)
+    scale = math.sqrt(max(m1 / len(a), m2 / len(b)))
+    ssub_a, ssub_b = sorted(sub_a), sorted(sub_b)
+
+    deltas = dict((p, []) for p in percentiles)
+    for _ in xrange(iterations):
+        ra = sorted(sub_a[int(rand.random() * m1)] for _ in xrange(m1))
+        rb = sorted(sub_b[int(rand.random() * m2)] for _ in xrange(m2))
+        for p in percentiles:
+            sub_diff = percentile(ssub_b, p) - percentile(ssub_a, p)
+            deltas[p].append(percentile(rb, p) - percentile(ra, p) - sub_diff)
+
+    alpha = (1 - confidence) / 2
+    intervals = {}
+    for p in percentiles:
+        diff = percentile(sb, p) - percentile(sa, p)
+        d = sorted(deltas[p])
+        low = d[int(alpha * iterations)]
+        high = d[min(iterations - 1, int((1 - alpha) * iterations))]
+        intervals[p] = (diff, diff + low * scale, diff + high * scale)
+    return intervals
+
+
+def print_comparison(urls, stats_list, total, alpha=0.05):
+    """打印两个目标的对比表格与显著性结论
+
+    args:
+        urls: (URL_A, URL_B)
+        stats_list: 对应的 ResultStats
+        total: 整个测试耗时(s)
+        alpha: 显著性水平
+    """
+    a, b = stats_list
+    if not a.results or not b.results:
+        print 'Not enough results to compare'
+        return
+
+    def row(name, fmt, va, vb):
+        print '%-28s %14s %14s' % (name, fmt % va, fmt % vb)
+
+    print 'A: %s' % (urls[0],)
+    print 'B: %s' % (urls[1],)
+    print ''
+    print '%-28s %14s %14s' % ('', 'A', 'B')
+    row('Complete requests:', '%d', len(a.results), len(b.results))
+    row('Failed requests:', '%d', a.failed_requests, b.failed_requests)
+    row('Requests per second:', '%.2f', len(a.results)/total, len(b.results)/total)
+    row('Time per request [ms]:', '%.3f', a.avg_req_time*1000, b.avg_req_time*1000)
+    row('Total transferred [bytes]:', '%d', a.total_req_length, b.total_req_length)
+    print ''
+    print 'Connection Times (ms, mean)'
+    names = ('Connect', 'Processing', 'Waiting', 'Total')
+    for name, da, db in zip(names, a.connection_times(), b.connection_times()):
+        row(name+':', '%.1f', da[1]*1000, db[1]*1000)
+    print ''
+    print 'Percentage of the requests served within a certain time (ms)'
+    for (percent, sa), (_, sb) in zip(a.distribution(), b.distribution()):
+        row(' %3d%%' % (percent,), '%.0f', sa*1000, sb*1000)
+
+    ta = [r.total_time for r in a.results]
+    tb = [r.total_time for r in b.results]
+    u, z, p = mann_whitney(ta, tb)
+    print ''
+    print 'Significance (B vs A, total time)'
+    print 'Mann-Whitney U:       %.1f (z=%.3f, p=%.4f)' % (u, z, p)
+    intervals = bootstrap_ci(ta, tb, COMPARE_PERCENTILES)
+    for pct in COMPARE_PERCENTILES:
+        diff, low, high = intervals[pct]
+        print 'p%-2d diff [ms]:         %+.3f (95%% CI %+.3f .. %+.3f)' % (
+                pct, diff*1000, low*1000, high*1000)
+    print ''
+    if p >= alpha:
+        print 'Verdict: no significant difference (p >= %.2f)' % (alpha,)
+    elif z < 0:
+        print 'Verdict: B is significantly SLOWER than A (p < %.2f)' % (alpha,)
+    else:
+        print 'Verdict: B is significantly FASTER than A (p < %.2f)' % (alpha,)
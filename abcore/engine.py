@@ -0,0 +1,144 @@
+#coding=utf8
+"""引擎接口与注册表
+
+引擎负责把请求来源中的 (target, url) 发送出去，并把结果加到对应的 ResultStats。
+新引擎继承 Engine 并用 register 注册即可被命令行 --engine 选用。
+"""
+
+import time
+
+from abcore.session import VirtualUser
+from abcore.worker import CurlWorker
+
+ENGINES = {}
+
+
+def register(cls):
+    """注册引擎类，可作为类装饰器使用"""
+    ENGINES[cls.name] = cls
+    return cls
+
+
+def available_engines():
+    """当前环境可用的引擎，按 priority 从高到低排列"""
+    engines = [cls for cls in ENGINES.values() if cls.available()]
+    return sorted(engines, key=lambda cls: cls.priority, reverse=True)
+
+
+def get_engine(name='auto'):
+    """按名字取引擎类
+
+    args:
+        name: 引擎名，auto 时取可用引擎中 priority 最高（最快）的一个
+    """
+    if name == 'auto':
+        engines = available_engines()
+        if not engines:
+            raise ValueError('no engine available on this host')
+        return engines[0]
+    try:
+        cls = ENGINES[name]
+    except KeyError:
+        raise ValueError('unknown engine: %s' % (name,))
+    if not cls.available():
+        raise ValueError('engine %s is not available on this host' % (name,))
+    return cls
+
+
+class Engine(object):
+    """引擎基类
+
+    Attributes:
+        name: 引擎名
+        priority: --engine auto 时的优先级，越大越优先
+        c: concurrency, Number of multiple requests to perform at a time
+        validate: 是否逐块回调 python 统计响应大小，见 CurlWorker
+        unix_socket: 不为 None 时经该 Unix domain socket 发送请求
+        script: 不为 None 时每个 worker 是执行该会话脚本的 VirtualUser
+        keep_processing: 为 False 时引擎应尽快停止发送新请求
+        deadline: 限时测试的截止时刻(time.time())，之后完成的请求不计入结果
+        stopped_at: 统计窗口的结束时刻，run 返回后有效
+        steady_since: 会话模式下第一个虚拟用户完成 setup、开始稳态步骤的时刻
+    """
+    name = None
+    priority = 0
+
+    def __init__(self, c=1, validate=False, unix_socket=None, script=None):
+        if unix_socket is not None:
+            import pycurl
+            if not hasattr(pycurl, 'UNIX_SOCKET_PATH'):
+                raise ValueError('--unix-socket needs pycurl >= 7.21.5')
+        self.c = c
+        self.validate = validate
+        self.unix_socket = unix_socket
+        self.script = script
+        self.keep_processing = True
+        self.deadline = None
+        self.stopped_at = None
+        self.steady_since = None
+
+    @classmethod
+    def available(cls):
+        """依赖是否已安装"""
+        return True
+
+    def make_worker(self, pycurl):
+        """按引擎参数创建 CurlWorker，会话模式下包装成 VirtualUser
+
+        args:
+            pycurl: pycurl 模块或与其接口相同的模块
+        """
+        script = self.script
+        validate = self.validate or (script is not None and script.needs_body)
+        worker = CurlWorker(pycurl, validate=validate,
+                            unix_socket=self.unix_socket)
+        if script is not None:
+            return VirtualUser(worker, script, self.sleep, self.mark_steady)
+        return worker
+
+    def new_worker(self):
+        """用引擎对应的 pycurl 模块创建 worker，见 make_worker"""
+        raise NotImplementedError
+
+    def sleep(self, seconds):
+        """会话思考时间，协程类引擎需要覆盖"""
+        time.sleep(seconds)
+
+    def stop(self):
+        self.keep_processing = False
+        self.mark_stopped()
+
+    def mark_stopped(self):
+        """记录统计窗口结束的时刻，只记第一次，不晚于截止时刻"""
+        if self.stopped_at is None:
+            now = time.time()
+            self.stopped_at = now if self.deadline is None else min(now, self.deadline)
+
+    def mark_steady(self):
+        """记录稳态统计窗口的开始时刻，取最早的一次"""
+        now = time.time()
+        if self.steady_since is None or now < self.steady_since:
+            self.steady_since = now
+
+    def set_duration(self, duration):
+        """从现在开始计时，duration 秒后到期"""
+        self.deadline = time.time() + duration if duration else None
+        self.stopped_at = None
+
+    def expired(self):
+        """已被停止或已过截止时刻"""
+        if not self.keep_processing:
+            return True
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def run(self, source, all_stats, duration=None):
+        """执行 source 中的请求，直到 source 耗尽、超时或被停止
+
+        返回前须设置 stopped_at（stop 或 mark_stopped），等待进行中请求的时间不计入
+
+        args:
+            source: 产生 (target, url) 的迭代器，可以是无限的
+            all_stats: ResultStats 列表，结果加到 all_stats[target]
+            duration: 限时(s)，None 表示不限时
+        """
+        raise NotImplementedError
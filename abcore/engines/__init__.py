@@ -0,0 +1,5 @@
+#coding=utf8
+"""导入全部内置引擎以完成注册"""
+
+from abcore.engines import thread_engine
+from abcore.engines import gevent_engine
@@ -0,0 +1,79 @@
+#coding=utf8
+"""gevent 引擎：pycurl multi 接口接入 gevent 事件循环，每个并发一个 greenlet
+
+gevent 只在 run 时导入，未安装 gevent 的机器上注册表仍可正常加载。
+"""
+
+from abcore.engine import Engine, register
+
+
+@register
+class GeventEngine(Engine):
+    """greenlet 池，每个 greenlet 复用一个 curl handle 依次取请求
+
+    请求来源只由一个 produce greenlet 迭代，来源中可以 sleep（如按时间回放）。
+    停止或到期时直接 kill 所有 greenlet，正在进行的传输随之从 multi handle 移除。
+    """
+    name = 'gevent'
+    priority = 10
+    pool = None
+
+    @classmethod
+    def available(cls):
+        try:
+            import gevent
+            import pycurl
+        except ImportError:
+            return False
+        return True
+
+    def run(self, source, all_stats, duration=None):
+        import gevent
+        from gevent.pool import Pool
+        from gevent.queue import Queue
+
+        self.set_duration(duration)
+        url_queue = Queue(self.c)
+        self.pool = Pool(self.c + 1)
+        self.pool.spawn(self.produce, source, url_queue)
+        for _ in xrange(self.c):
+            self.pool.spawn(self.work, self.new_worker(), url_queue, all_stats)
+        timer = gevent.spawn_later(duration, self.stop) if duration else None
+        self.pool.join()
+        self.mark_stopped()
+        if timer is not None:
+            timer.kill()
+
+    def new_worker(self):
+        import utils.gevent_pycurl as pycurl
+        return self.make_worker(pycurl)
+
+    def sleep(self, seconds):
+        import gevent
+        gevent.sleep(seconds)
+
+    def stop(self):
+        Engine.stop(self)
+        if self.pool is not None:
+            self.pool.kill(block=False)
+
+    def produce(self, source, url_queue):
+        try:
+            for item in source:
+                if self.expired():
+                    break
+                url_queue.put(item)
+        finally:
+            # 被 stop kill 时 worker 也已被 kill，队列满时 put 会永远阻塞
+            if not self.expired():
+                for _ in xrange(self.c):
+                    url_queue.put(None)
+
+    def work(self, worker, url_queue, all_stats):
+        while True:
+            item = url_queue.get()
+            if item is None or self.expired():
+                break
+            target, result = worker.handle(item)
+            if result is not None and not self.expired():
+                all_stats[target].add(result)
@@ -0,0 +1,140 @@
+#coding=utf8
+"""线程引擎：每个并发一个线程，各自持有一个 pycurl handle"""
+
+import Queue
+import threading
+import time
+
+from abcore.engine import Engine, register
+
+
+class UrlConsumer(threading.Thread):
+    """Url consumer
+
+    发送请求worker，取到 None 时把 None 放回结果队列后退出，
+    引擎到期后完成的请求直接丢弃
+
+    Attributes:
+        engine: 所属引擎
+        url_queue: url作业队列
+        result_queue: 结果队列
+    """
+
+    def __init__(self, engine, url_queue, result_queue):
+        threading.Thread.__init__(self)
+        self.setDaemon(True)
+        self.engine = engine
+        self.url_queue = url_queue
+        self.result_queue = result_queue
+        self.worker = engine.new_worker()
+
+    def run(self):
+        while self.engine.keep_processing:
+            item = self.url_queue.get()
+            if item is None:
+                break
+            target, result = self.worker.handle(item)
+            if self.engine.expired():
+                break
+            self.result_queue.put((target, result))
+        self.result_queue.put(None)
+
+
+class UrlProducer(threading.Thread):
+    """url生产类
+
+    把请求来源中的 (target, url) 放入作业队列，结束后为每个 consumer 放一个 None
+
+    Attributes:
+        engine: 所属引擎
+        url_queue: 生产结果存放队列
+        source: 产生 (target, url) 的迭代器
+    """
+    def __init__(self, engine, url_queue, source):
+        threading.Thread.__init__(self)
+        self.setDaemon(True)
+        self.engine = engine
+        self.url_queue = url_queue
+        self.source = source
+
+    def run(self):
+        try:
+            for item in self.source:
+                if not self.engine.keep_processing:
+                    break
+                self.url_queue.put(item)
+        finally:
+            # 请求来源出错时也要让 consumer 退出，否则 run 会一直等下去；
+            # 已停止时 consumer 不再取队列，队列满时 put 会永远阻塞
+            if not self.engine.expired():
+                for _ in xrange(self.engine.c):
+                    self.url_queue.put(None)
+
+
+@register
+class ThreadEngine(Engine):
+    """UrlConsumer 线程池
+
+    主线程带超时地等结果队列，以便及时响应截止时刻和 SIGINT；
+    到期后最多再等 shutdown_grace 秒让线程结束手上的请求，仍未结束的留在 daemon 线程里。
+    """
+    name = 'thread'
+    priority = 0
+
+    @classmethod
+    def available(cls):
+        try:
+            import pycurl
+        except ImportError:
+            return False
+        return True
+
+    poll_interval = 0.1
+    shutdown_grace = 1.0
+
+    def new_worker(self):
+        import pycurl
+        return self.make_worker(pycurl)
+
+    def run(self, source, all_stats, duration=None):
+        self.set_duration(duration)
+        url_queue = Queue.Queue(100)
+        result_queue = Queue.Queue()
+        consumers = [UrlConsumer(self, url_queue, result_queue)
+                     for _ in xrange(self.c)]
+        for consumer in consumers:
+            consumer.start()
+        UrlProducer(self, url_queue, source).start()
+
+        running = self.c
+        while running and not self.expired():
+            timeout = self.poll_interval
+            if self.deadline is not None:
+                timeout = max(0, min(timeout, self.deadline - time.time()))
+            try:
+                item = result_queue.get(timeout=timeout)
+            except Queue.Empty:
+                continue
+            if item is None:
+                running -= 1
+            else:
+                self.add_result(item, all_stats)
+        self.stop()
+
+        # 已进入队列的结果都在截止前完成
+        while True:
+            try:
+                item = result_queue.get_nowait()
+            except Queue.Empty:
+                break
+            if item is not None:
+                self.add_result(item, all_stats)
+
+        grace_deadline = time.time() + self.shutdown_grace
+        for consumer in consumers:
+            consumer.join(max(0, grace_deadline - time.time()))
+
+    def add_result(self, item, all_stats):
+        target, result = item
+        if result is not None:
+            all_stats[target].add(result)
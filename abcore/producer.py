@@ -0,0 +1,235 @@
+#coding=utf8
+"""请求来源
+
+引擎从这里取 (target, url)，target 为 url 在 urls 列表中的下标，
+用来把结果归到对应的 ResultStats。
+
+url 可以是模板，如 http://host/item/{id}，{id} 的取值由 UrlParam 描述。
+模板在测试开始前展开成一个 url 环（字符串列表），发送时只按下标取字符串。
+"""
+
+from __future__ import division
+import itertools
+import math
+import random
+import string
+import sys
+
+# 请求数不限且只含随机参数时 url 环的默认长度
+DEFAULT_RING_SIZE = 10000
+# 未指定 --ring-size 时 url 环的最大长度
+MAX_RING_SIZE = 1000000
+
+
+class UrlParam(object):
+    """url 模板参数
+
+    spec 格式：
+        range:START:END        START..END 依次循环
+        uniform:START:END      START..END 均匀随机
+        zipf:START:END[:S]     START..END 按 zipf 分布随机，START 最热，S 默认 1.0
+        file:PATH              文件中每行一个值，依次循环
+
+    Attributes:
+        name: 模板中的字段名
+        kind: range/uniform/zipf/file
+        length: 依次循环的参数一轮的长度，随机参数为 None
+        keys: 可能取值的个数
+    """
+    KINDS = ('range', 'uniform', 'zipf', 'file')
+
+    def __init__(self, name, spec):
+        self.name = name
+        kind, _, rest = spec.partition(':')
+        if kind not in self.KINDS or not rest:
+            raise ValueError('bad param spec for %s: %s' % (name, spec))
+        self.kind = kind
+        self.length = None
+        if kind == 'file':
+            with open(rest) as f:
+                self.items = [line.strip() for line in f if line.strip()]
+            if not self.items:
+                raise ValueError('param file is empty: %s' % (rest,))
+            self.length = self.keys = len(self.items)
+            return
+        args = rest.split(':')
+        try:
+            self.start, self.end = int(args[0]), int(args[1])
+            self.s = float(args[2]) if kind == 'zipf' and len(args) > 2 else 1.0
+        except (IndexError, ValueError):
+            raise ValueError('bad param spec for %s: %s' % (name, spec))
+        if self.end < self.start:
+            raise ValueError('bad param range for %s: %s' % (name, spec))
+        self.keys = self.end - self.start + 1
+        if kind == 'range':
+            self.length = self.keys
+        if kind == 'zipf' and self.s <= 0:
+            raise ValueError('zipf exponent must be positive for %s: %s' % (name, spec))
+
+    @classmethod
+    def parse(cls, option):
+        """解析命令行 --param NAME=SPEC"""
+        name, sep, spec = option.partition('=')
+        if not sep or not name:
+            raise ValueError('bad param: %s (want NAME=SPEC)' % (option,))
+        return cls(name, spec)
+
+    def values(self, size, rand):
+        """生成 size 个取值
+
+        args:
+            size: 取值个数
+            rand: random.Random 实例
+        """
+        if self.kind == 'file':
+            items = self.items
+            return [items[i % len(items)] for i in xrange(size)]
+        if self.kind == 'range':
+            return [self.start + i % self.length for i in xrange(size)]
+        if self.kind == 'uniform':
+            start, end = self.start, self.end
+            return [rand.randint(start, end) for _ in xrange(size)]
+        sample = ZipfSampler(self.keys, self.s, rand).sample
+        start = self.start - 1
+        return [start + sample() for _ in xrange(size)]
+
+
+class ZipfSampler(object):
+    """zipf 分布采样，取值 1..n，P(k) 正比于 1/k**s
+
+    rejection-inversion 方法（Hörmann & Derflinger 1996），不需要按 n 建表，
+    任意 n 下准备和每次采样都是 O(1)。
+
+    Attributes:
+        n: 取值个数
+        s: 指数，须大于 0
+        rand: random.Random 实例
+    """
+
+    def __init__(self, n, s, rand):
+        self.n = n
+        self.s = s
+        self.rand = rand
+        self.h_integral_x1 = self.h_integral(1.5) - 1.0
+        self.h_integral_n = self.h_integral(n + 0.5)
+        self.threshold = 2.0 - self.h_integral_inverse(
+            self.h_integral(2.5) - self.h(2))
+
+    def sample(self):
+        rand = self.rand
+        while True:
+            u = self.h_integral_n + rand.random() * (self.h_integral_x1 - self.h_integral_n)
+            x = self.h_integral_inverse(u)
+            k = min(max(int(x + 0.5), 1), self.n)
+            if k - x <= self.threshold or u >= self.h_integral(k + 0.5) - self.h(k):
+                return k
+
+    def h(self, x):
+        return math.exp(-self.s * math.log(x))
+
+    def h_integral(self, x):
+        log_x = math.log(x)
+        return _expm1_ratio((1 - self.s) * log_x) * log_x
+
+    def h_integral_inverse(self, x):
+        t = max(x * (1 - self.s), -1.0)
+        return math.exp(_log1p_ratio(t) * x)
+
+
+def _log1p_ratio(x):
+    """log(1+x)/x，x 接近 0 时用泰勒展开"""
+    if abs(x) > 1e-8:
+        return math.log1p(x) / x
+    return 1 - x * (0.5 - x * (1 / 3 - 0.25 * x))
+
+
+def _expm1_ratio(x):
+    """(exp(x)-1)/x，x 接近 0 时用泰勒展开"""
+    if abs(x) > 1e-8:
+        return math.expm1(x) / x
+    return 1 + x * 0.5 * (1 + x / 3 * (1 + 0.25 * x))
+
+
+def template_fields(url, params):
+    """url 模板中的字段名
+
+    只有引用了 params 中某个参数的 url 才是模板，按 str.format 解析，字面花括号写作 {{ }}；
+    其余 url 原样发送，可以带花括号。
+
+    args:
+        url: url 或 url 模板
+        params: {name: UrlParam}
+    return: 字段名集合，不是模板时为空
+    """
+    try:
+        fields = set(field for _, field, _, _ in string.Formatter().parse(url)
+                     if field is not None)
+    except ValueError, e:
+        if any('{' + name in url for name in params):
+            raise ValueError('bad url template %s: %s' % (url, e))
+        return set()
+    if fields & set(params):
+        return fields
+    return set()
+
+
+def ring_size(fields, params, n=None):
+    """未指定 --ring-size 时 url 环的长度
+
+    请求数有限时取每个目标的请求数 n，整个测试不重复；否则取 DEFAULT_RING_SIZE
+    与各循环参数一轮长度中的最大值。都不超过 MAX_RING_SIZE。
+    """
+    if n is not None:
+        return min(n, MAX_RING_SIZE)
+    return min(MAX_RING_SIZE, max([DEFAULT_RING_SIZE] + [
+        params[name].length for name in fields if params[name].length]))
+
+
+def expand(url, params, size=None, seed=0, n=None):
+    """把 url 模板展开成 url 环
+
+    同一 seed 下展开结果固定，A/B 对比时两个目标拿到相同的取值序列。
+    环会被重复使用且比参数的取值空间小时，向 stderr 输出警告。
+
+    args:
+        url: url 或 url 模板
+        params: {name: UrlParam}
+        size: 环的长度，默认见 ring_size
+        seed: 随机种子
+        n: 每个目标的请求数，None 表示不限
+    """
+    fields = sorted(template_fields(url, params))
+    if not fields:
+        return [url]
+    missing = [name for name in fields if name not in params]
+    if missing:
+        raise ValueError('no --param for %s' % (', '.join(missing),))
+    if size is None:
+        size = ring_size(fields, params, n)
+    if n is None or n > size:
+        for name in fields:
+            if params[name].keys > size:
+                print >> sys.stderr, ('warning: url ring holds %d urls but {%s} has %d '
+                                      'values; urls repeat every %d requests '
+                                      '(raise --ring-size)' % (
+                                          size, name, params[name].keys, size))
+    rand = random.Random(seed)
+    columns = [params[name].values(size, rand) for name in fields]
+    return [url.format(**dict(zip(fields, row))) for row in zip(*columns)]
+
+
+def interleave(rings, n):
+    """交替产生 (target, url)，每个目标 n 个请求
+
+    采用 ABBA 顺序，使两个目标在每一轮里的先后位置互相抵消。
+
+    args:
+        rings: 每个目标的 url 环，见 expand
+        n: 每个目标的请求数，None 表示不限，由引擎的限时结束
+    """
+    order = range(len(rings))
+    for i in (itertools.count() if n is None else xrange(n)):
+        seq = order if i % 2 == 0 else order[::-1]
+        for target in seq:
+            ring = rings[target]
+            yield target, ring[i % len(ring)]
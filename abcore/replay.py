@@ -0,0 +1,155 @@
+#coding=utf8
+"""按原始时间间隔回放访问日志
+
+支持两种格式，按行自动识别，.gz 文件直接解压读取：
+    access log (common/combined)：
+        127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET /item/1 HTTP/1.0" 200 2326
+    jsonl，每行一个对象，timestamp 为 epoch 秒：
+        {"timestamp": 1700000000.25, "method": "GET", "url": "/item/1"}
+
+文件逐行读取，不整体载入内存。只回放 GET 请求，其余方法、无法解析和无法拼出 url 的行计入 skipped。
+"""
+
+from __future__ import division
+import calendar
+import functools
+import gzip
+import json
+import re
+import threading
+import time
+import urlparse
+
+CLF_RE = re.compile(r'^\S+ \S+ \S+ \[([^\]]+)\] "(\S+) (\S+)[^"]*"')
+
+# worker 实际发出时间晚于计划时间超过该值(s)的请求计为 late
+LATE_THRESHOLD = 0.01
+
+
+def parse_clf_time(value):
+    """'10/Oct/2000:13:55:36 -0700' -> epoch 秒"""
+    stamp, _, zone = value.partition(' ')
+    seconds = calendar.timegm(time.strptime(stamp, '%d/%b/%Y:%H:%M:%S'))
+    if zone:
+        offset = int(zone[1:3]) * 3600 + int(zone[3:5]) * 60
+        seconds -= offset if zone[0] == '+' else -offset
+    return seconds
+
+
+def parse_line(line):
+    """解析一行日志
+
+    return: (timestamp, method, url)，无法解析时返回 None
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line[0] == '{':
+            record = json.loads(line)
+            timestamp = record.get('timestamp', record.get('ts', record.get('time')))
+            url = record.get('url', record.get('path'))
+            if timestamp is None or url is None:
+                return None
+            return float(timestamp), record.get('method', 'GET'), url
+        match = CLF_RE.match(line)
+        if match is None:
+            return None
+        stamp, method, url = match.groups()
+        return parse_clf_time(stamp), method, url
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class TraceReplay(object):
+    """访问日志回放请求来源
+
+    Attributes:
+        path: 日志文件路径
+        base_url: 日志中为相对路径时拼接的 url 前缀
+        speed: 回放加速倍数，2 表示间隔缩短一半
+        skipped: 跳过的行数，包括方法不是 GET、无法解析和无法拼出 url 的行
+        late: worker 晚于计划时间超过 LATE_THRESHOLD 发出的请求数
+        max_lag: 最大延迟(s)
+    """
+
+    def __init__(self, path, base_url=None, speed=1.0):
+        if speed <= 0:
+            raise ValueError('replay speed must be positive')
+        self.path = path
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.speed = speed
+        self.skipped = 0
+        self.late = 0
+        self.max_lag = 0.0
+        self.lock = threading.Lock()
+        # 先读到第一条可回放的请求，尽早发现格式和 base_url 的问题
+        with self.open() as f:
+            for line in f:
+                parsed = parse_line(line)
+                if parsed is not None and parsed[1] == 'GET':
+                    self.make_url(parsed[2])
+                    break
+            else:
+                raise ValueError('no GET request found in %s' % (path,))
+
+    def open(self):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, 'rb')
+        return open(self.path)
+
+    def make_url(self, url):
+        if isinstance(url, unicode):
+            url = url.encode('utf8')
+        if urlparse.urlparse(url).scheme in ('http', 'https'):
+            return url
+        if self.base_url is None:
+            raise ValueError('relative url in %s needs --replay-base: %s' % (
+                self.path, url))
+        return self.base_url + ('' if url.startswith('/') else '/') + url
+
+    def requests(self):
+        """逐行产生 (timestamp, url)"""
+        with self.open() as f:
+            for line in f:
+                parsed = parse_line(line)
+                if parsed is None or parsed[1] != 'GET':
+                    self.skipped += 1
+                    continue
+                try:
+                    url = self.make_url(parsed[2])
+                except ValueError:
+                    self.skipped += 1
+                    continue
+                yield parsed[0], url
+
+    def dispatched(self, due):
+        """worker 取到请求时调用，统计相对计划时间的延迟"""
+        lag = time.time() - due
+        if lag > LATE_THRESHOLD:
+            with self.lock:
+                self.late += 1
+                self.max_lag = max(self.max_lag, lag)
+
+    def items(self, n=None, sleep=time.sleep):
+        """按原始间隔（除以 speed）产生 (target, url, 回调)，第一条立即发出
+
+        延迟在 worker 取到请求时由回调统计，包括在引擎队列中等待空闲 worker 的时间。
+
+        args:
+            n: 最多回放的请求数，None 表示回放整个文件
+            sleep: 等待用的 sleep 函数，由引擎提供
+        """
+        start = first = None
+        count = 0
+        for timestamp, url in self.requests():
+            if n is not None and count >= n:
+                break
+            if start is None:
+                start, first = time.time(), timestamp
+            due = start + (timestamp - first) / self.speed
+            now = time.time()
+            if due > now:
+                sleep(due - now)
+            count += 1
+            yield 0, url, functools.partial(self.dispatched, due)
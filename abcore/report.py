@@ -0,0 +1,112 @@
+#coding=utf8
+"""测试报告输出，格式与 apache bench 保持一致"""
+
+from __future__ import division
+
+from abcore.compare import print_comparison
+from abcore.stats import ResultStats
+
+
+def print_report(urls, all_stats, c, total):
+    """打印测试报告
+
+    args:
+        urls: url列表，两个url时输出 A/B 对比报告
+        all_stats: 与 urls 对应的 ResultStats 列表
+        c: 并发数
+        total: 整个测试耗时(s)
+    """
+    print 'done'
+    print ''
+    print ''
+    if len(urls) > 1:
+        print_comparison(urls, all_stats, total)
+        return
+    print_summary(all_stats[0], c, total)
+
+
+def print_summary(stats, c, total):
+    """打印单个目标的 ab 格式报告"""
+    if not stats.results:
+        print 'No requests completed'
+        return
+    print 'Average Document Length: %.0f bytes' % (stats.avg_req_length,)
+    print ''
+    print 'Concurrency Level:    %d' % (c,)
+    print 'Time taken for tests: %.3f seconds' % (total,)
+    print 'Complete requests:    %d' % (len(stats.results),)
+    print 'Failed requests:      %d' % (stats.failed_requests,)
+    print 'Total transferred:    %d bytes' % (stats.total_req_length,)
+    print 'HTML transferred:    %d bytes' % (stats.html_req_length,)
+    print 'Requests per second:  %.2f [#/sec] (mean)' % (len(stats.results)/total,)
+    print 'Time per request:     %.3f [ms] (mean)' % (stats.avg_req_time*1000,)
+    print 'Time per request:     %.3f [ms] (mean, across all concurrent requests)' % (
+                                            stats.avg_req_time*1000/c,)
+    print 'Transfer rate:        %.2f [Kbytes/sec] received' % (stats.total_req_length/total/1024,)
+    print ''
+    print 'Connection Times (ms)'
+    print '              min  mean[+/-sd] median   max'
+    names = ('Connect', 'Processing', 'Waiting', 'Total')
+    for name, data in zip(names, stats.connection_times()):
+        t_min, t_mean, t_sd, t_median, t_max = [v*1000 for v in data] # to [ms]
+        t_min, t_mean, t_median, t_max = [round(v) for v in (t_min, t_mean,
+                                          t_median, t_max)]
+        print '%-11s %5d %5d %5.1f %6d %7d' % (name+':', t_min, t_mean, t_sd,
+                                                       t_median, t_max)
+    print ''
+    print 'Percentage of the requests served within a certain time (ms)'
+    for percent, seconds in stats.distribution():
+        print ' %3d%% %6.0f' % (percent, seconds*1000),
+        if percent == 100:
+            print '(longest request)'
+        else:
+            print ""
+
+
+def print_session_report(script, all_stats, c, total, setup_time):
+    """打印会话模式报告
+
+    汇总部分只包含非 setup 步骤，耗时为稳态窗口；之后按步骤列出延迟。
+
+    args:
+        script: SessionScript
+        all_stats: 与 script.steps 对应的 ResultStats 列表
+        c: 并发数（虚拟用户数）
+        total: 稳态窗口(s)，从第一个虚拟用户完成 setup 到测试结束
+        setup_time: 测试开始到第一个虚拟用户完成 setup 的耗时(s)
+    """
+    print 'done'
+    print ''
+    print ''
+    steady = ResultStats()
+    for step, stats in zip(script.steps, all_stats):
+        if not step.setup:
+            steady.results.extend(stats.results)
+    setup = sum(len(stats.results) for step, stats in zip(script.steps, all_stats)
+                if step.setup)
+    print_summary(steady, c, total)
+    print ''
+    print 'Setup requests:       %d' % (setup,)
+    print 'Setup time:           %.3f seconds (until the first user finished setup)' % (
+                                                                        setup_time,)
+    print ''
+    print 'Per-step latency (ms)'
+    print '%-24s %8s %8s %8s %8s %8s' % ('', 'count', 'failed', 'mean', '50%', '99%')
+    for step, stats in zip(script.steps, all_stats):
+        name = step.name + (' (setup)' if step.setup else '')
+        if not stats.results:
+            print '%-24s %8d' % (name[:24], 0)
+            continue
+        dist = dict(stats.distribution())
+        print '%-24s %8d %8d %8.1f %8.1f %8.1f' % (name[:24], len(stats.results),
+                stats.failed_requests, stats.avg_req_time*1000,
+                dist[50]*1000, dist[99]*1000)
+
+
+def print_replay_report(replay):
+    """打印回放的调度情况"""
+    print ''
+    print 'Replay speed:         %.2fx' % (replay.speed,)
+    print 'Skipped lines:        %d' % (replay.skipped,)
+    print 'Late requests:        %d (max lag %.3f seconds)' % (replay.late,
+                                                            replay.max_lag)
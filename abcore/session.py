@@ -0,0 +1,251 @@
+#coding=utf8
+"""有状态的虚拟用户会话
+
+会话脚本为 JSON：
+
+    {
+        "base_url": "http://127.0.0.1:8080",
+        "setup": [
+            {"name": "login", "method": "POST", "url": "/login",
+             "data": "user=bench&password=secret",
+             "extract": {"token": "\"token\":\\s*\"([^\"]+)\""}}
+        ],
+        "steps": [
+            {"name": "profile", "url": "/me",
+             "headers": ["Authorization: Bearer {token}"],
+             "think": "uniform:0.1:0.5"}
+        ]
+    }
+
+每个 worker 是一个 VirtualUser，持有自己的 curl handle（即自己的 cookie jar）和变量。
+setup 步骤先执行一次，之后循环执行 steps。url、headers、data 中的 {name}
+取自 extract 从响应 body 中用正则第一个分组提取的变量；name 必须是某一步 extract
+的变量，否则加载脚本时报错。其余花括号（如 JSON 请求体）原样发送。
+"""
+
+import json
+import random
+import re
+import sys
+import urlparse
+
+# 每步请求方法的默认值
+DEFAULT_METHOD = 'GET'
+
+VARIABLE_RE = re.compile(r'\{(\w+)\}')
+
+
+def parse_think(spec):
+    """解析思考时间
+
+    spec 格式：
+        SECONDS             固定时间
+        uniform:MIN:MAX     均匀分布
+        exp:MEAN            指数分布
+
+    return: 接受 random.Random 返回秒数的函数，spec 为空时返回 None
+    """
+    if spec is None or spec == '' or spec == 0:
+        return None
+    try:
+        if isinstance(spec, (int, float)):
+            seconds = float(spec)
+            return lambda rand: seconds
+        kind, _, rest = spec.partition(':')
+        if not rest:
+            seconds = float(kind)
+            return lambda rand: seconds
+        args = [float(x) for x in rest.split(':')]
+        if kind == 'uniform' and len(args) == 2:
+            low, high = args
+            return lambda rand: rand.uniform(low, high)
+        if kind == 'exp' and len(args) == 1 and args[0] > 0:
+            rate = 1 / args[0]
+            return lambda rand: rand.expovariate(rate)
+    except ValueError:
+        pass
+    raise ValueError('bad think time: %s' % (spec,))
+
+
+def render(template, variables, names):
+    """展开 {name} 变量，返回 utf8 编码的 str 以便传给 pycurl
+
+    args:
+        template: 模板
+        variables: 已提取的变量
+        names: 脚本中 extract 的全部变量名，不在其中的 {word} 原样保留
+    """
+    def replace(match):
+        name = match.group(1)
+        if name not in names:
+            return match.group(0)
+        if name not in variables:
+            raise ValueError('variable {%s} has not been extracted yet' % (name,))
+        return variables[name]
+    value = VARIABLE_RE.sub(replace, template)
+    if isinstance(value, unicode):
+        value = value.encode('utf8')
+    return value
+
+
+class Step(object):
+    """会话中的一步请求
+
+    Attributes:
+        name: 步骤名，报告中使用
+        method: 请求方法
+        url: url 模板
+        headers: header 模板列表，如 "Authorization: Bearer {token}"
+        data: 请求体模板，None 表示没有请求体
+        extract: {变量名: 正则}，取第一个分组
+        think: 本步完成后的思考时间，见 parse_think
+        setup: 是否 setup 步骤，setup 步骤不计入稳态统计
+    """
+
+    def __init__(self, spec, base_url='', setup=False):
+        if not isinstance(spec, dict) or 'url' not in spec:
+            raise ValueError('session step needs a url: %r' % (spec,))
+        self.url = urlparse.urljoin(base_url, spec['url'])
+        if urlparse.urlparse(self.url).scheme not in ('http', 'https'):
+            raise ValueError('need the right URL in session step: %s' % (self.url,))
+        self.name = spec.get('name') or spec['url']
+        self.method = str(spec.get('method', DEFAULT_METHOD)).upper()
+        self.headers = list(spec.get('headers', []))
+        self.data = spec.get('data')
+        try:
+            self.extract = dict((var, re.compile(pattern))
+                                for var, pattern in spec.get('extract', {}).items())
+        except re.error, e:
+            raise ValueError('bad extract pattern in step %s: %s' % (self.name, e))
+        self.think = parse_think(spec.get('think'))
+        self.setup = setup
+
+    def templates(self):
+        """url、headers、data 中所有模板"""
+        templates = [self.url] + self.headers
+        if self.data is not None:
+            templates.append(self.data)
+        return templates
+
+
+class SessionScript(object):
+    """会话脚本
+
+    Attributes:
+        steps: 全部步骤，setup 步骤在前，下标即结果统计中的 target
+        setup_count: setup 步骤个数
+        needs_body: 是否有步骤需要从 body 中提取变量
+        names: 各步骤 extract 的变量名
+    """
+
+    def __init__(self, setup, steps):
+        if not steps:
+            raise ValueError('session script has no steps')
+        self.steps = setup + steps
+        self.setup_count = len(setup)
+        self.needs_body = any(step.extract for step in self.steps)
+        self.names = set(var for step in self.steps for var in step.extract)
+        for step in self.steps:
+            for template in step.templates():
+                for name in VARIABLE_RE.findall(template):
+                    # 没有任何步骤提取的变量多半是拼错了
+                    if name not in self.names:
+                        raise ValueError('undefined variable {%s} in step %s' % (
+                            name, step.name))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            try:
+                spec = json.load(f)
+            except ValueError, e:
+                raise ValueError('bad session script %s: %s' % (path, e))
+        if not isinstance(spec, dict):
+            raise ValueError('bad session script %s: not an object' % (path,))
+        base_url = spec.get('base_url', '')
+        setup = [Step(s, base_url, setup=True) for s in spec.get('setup', [])]
+        steps = [Step(s, base_url) for s in spec.get('steps', [])]
+        return cls(setup, steps)
+
+
+class VirtualUser(object):
+    """虚拟用户，代替 CurlWorker 被引擎调用
+
+    先执行 setup 步骤，任一步失败或提取不到变量时下次从头重新 setup；
+    之后循环执行 steps。每次 handle 执行一步，返回 (步骤下标, Result)。
+
+    Attributes:
+        worker: CurlWorker，需要提取变量时必须以 validate 创建
+        script: SessionScript
+        sleep: 思考时间使用的 sleep 函数，由引擎提供
+        on_steady: 本用户第一次开始非 setup 步骤时调用，由引擎提供，可为 None
+        variables: 本用户提取到的变量
+    """
+
+    def __init__(self, worker, script, sleep, on_steady=None):
+        self.worker = worker
+        self.script = script
+        self.sleep = sleep
+        self.on_steady = on_steady
+        self.rand = random.Random()
+        self.variables = {}
+        self.index = 0
+        # 空字符串启用 libcurl 的内存 cookie jar，每个 curl handle 各自一份
+        worker.c.setopt(worker.pycurl.COOKIEFILE, '')
+
+    def handle(self, item):
+        script = self.script
+        target = self.index
+        step = script.steps[target]
+        if not step.setup and self.on_steady is not None:
+            self.on_steady()
+            self.on_steady = None
+        result, ok = self.perform(step)
+        if step.setup and not ok:
+            self.index = 0
+        else:
+            self.index += 1
+            if self.index == len(script.steps):
+                self.index = script.setup_count
+        if step.think is not None:
+            self.sleep(step.think(self.rand))
+        return target, result
+
+    def perform(self, step):
+        """执行一步请求
+
+        return: (Result, ok) ok 表示请求成功且变量都已提取
+        """
+        worker = self.worker
+        c, pycurl = worker.c, worker.pycurl
+        variables, names = self.variables, self.script.names
+        try:
+            url = render(step.url, variables, names)
+            headers = [render(h, variables, names) for h in step.headers]
+            data = None if step.data is None else render(step.data, variables, names)
+        except ValueError, e:
+            print >> sys.stderr, 'step %s: %s' % (step.name, e)
+            return None, False
+        if data is not None:
+            c.setopt(pycurl.POSTFIELDS, data)
+        else:
+            c.setopt(pycurl.HTTPGET, 1)
+        c.setopt(pycurl.CUSTOMREQUEST, step.method)
+        c.setopt(pycurl.HTTPHEADER, headers)
+        if step.extract:
+            worker.chunks = []
+        try:
+            result = worker.get_url(url)
+            body = ''.join(worker.chunks) if step.extract else ''
+        finally:
+            worker.chunks = None
+        if result is None or result.status >= 400:
+            return result, False
+        ok = True
+        for var, pattern in step.extract.items():
+            match = pattern.search(body)
+            if match:
+                variables[var] = match.group(1) if pattern.groups else match.group(0)
+            else:
+                ok = False
+        return result, ok
@@ -0,0 +1,111 @@
+#coding=utf8
+"""请求结果与结果统计"""
+
+from __future__ import division
+import math
+
+
+class Result(object):
+    """请求返回需要数据类
+
+    Attributes:
+           time_dict: time dict
+               connect_time: the amount of time it took for the socket to open
+               proc_time: first byte + transfer
+               wait_time: time till first byte
+               total_time: Sum of Connect + Processing
+           total_size: The total number of bytes received from the server
+           html_size: The total number of document bytes received from the server 
+           status: http response status code
+    """
+    def __init__(self, time_dict, total_size, 
+            html_size, status):
+        self.total_time = time_dict["total_time"]
+        self.connect_time = time_dict["connect_time"]
+        self.proc_time = time_dict["proc_time"]
+        self.waiting_time = time_dict["wait_time"]
+        self.total_size = total_size
+        self.html_size = html_size
+        self.status = status
+    
+    def __str__(self):
+        return 'Result(%.3f, %d, %d)' % (self.total_time, self.total_size, self.status)
+
+class ResultStats(object):
+    """结果统计汇总统计类
+
+    Attributes:
+        results: 请求结果Result列表
+    """
+    def __init__(self):
+        self.results = []
+    
+    def add(self, result):
+        self.results.append(result)
+    
+    @property
+    def failed_requests(self):
+        return sum(1 for r in self.results if r.status != 200)
+    
+    @property
+    def total_req_time(self):
+        return sum(r.total_time for r in self.results)
+
+    @property
+    def avg_req_time(self):
+        return self.total_req_time / len(self.results)
+    
+    @property
+    def total_req_length(self):
+        return sum(r.total_size for r in self.results)
+    
+    @property
+    def html_req_length(self):
+        return sum(r.html_size for r in self.results)
+
+    @property
+    def avg_req_length(self):
+        return self.total_req_length / len(self.results)
+    
+    def distribution(self):
+        """请求分布
+
+           return: list
+        """
+        results = sorted(r.total_time for r in self.results)
+        dist = []
+        n = len(results)
+        for p in (50, 66, 75, 80, 90, 95, 98, 99):
+            i = p/100 * n
+            i = n-1 if i >= n else int(i)
+            dist.append((p, results[i]))
+        dist.append((100, results[-1]))
+        return dist
+
+    def connection_times(self):
+        """连接时间计算""" 
+
+        connect = [r.connect_time for r in self.results]
+        process = [r.proc_time for r in self.results]
+        wait = [r.waiting_time for r in self.results]
+        total = [r.total_time for r in self.results]
+        
+        square_sum = lambda l: sum(x*x for x in l)
+        # 平均数
+        mean = lambda l: sum(l)/len(l)
+        # 方差
+        deviations = lambda l, mean: [x-mean for x in l]
+        # 标准方差
+        def std_deviation(l):
+            n = len(l)
+            if n == 1:
+                return 0
+            return math.sqrt(square_sum(deviations(l, mean(l)))/(n-1))
+        # 中位数
+        median = lambda l: sorted(l)[int(len(l)//2)]
+            
+        results = []
+        for data in (connect, process, wait, total):
+            results.append((min(data), mean(data), std_deviation(data),
+                            median(data), max(data)))
+        return results
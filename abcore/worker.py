@@ -0,0 +1,111 @@
+#coding=utf8
+"""基于 pycurl easy 接口的请求 worker，各引擎共用"""
+
+import os
+import traceback
+
+from abcore.stats import Result
+
+_null_sink = None
+
+
+def null_sink():
+    """所有 worker 共用的 /dev/null 文件，libcurl 直接 fwrite 进去，不回调 python"""
+    global _null_sink
+    if _null_sink is None:
+        _null_sink = open(os.devnull, 'wb')
+    return _null_sink
+
+
+class CurlWorker(object):
+    """发送单个请求并生成 Result
+
+    默认 body 由 libcurl 写入 null_sink，大小在请求结束后从 SIZE_DOWNLOAD、HEADER_SIZE 读取；
+    validate 时才逐块回调 python 统计收到的字节。
+
+    Attributes:
+        pycurl: pycurl 模块，gevent 引擎传入 utils.gevent_pycurl
+        c: curl handle，worker 生命周期内复用
+        validate: 是否用 python 回调统计响应大小
+        chunks: validate 时若为列表，收到的 body 块追加到其中
+        unix_socket: 不为 None 时经该 Unix domain socket 连接，url 中的 host 只用于 Host 头
+    """
+
+    def __init__(self, pycurl, validate=False, unix_socket=None):
+        self.pycurl = pycurl
+        self.validate = validate
+        self.unix_socket = unix_socket
+        self.c = pycurl.Curl()
+        # 指定HTTP重定向的最大数
+        self.c.setopt(pycurl.MAXCONNECTS, 1)    
+        # 强制获取新的连接，即替代缓存中的连接
+        self.c.setopt(pycurl.FRESH_CONNECT, 1)
+        if validate:
+            self.c.setopt(pycurl.WRITEFUNCTION, self.set_body_size)
+            self.c.setopt(pycurl.HEADERFUNCTION, self.set_head_size)
+        else:
+            self.c.setopt(pycurl.WRITEDATA, null_sink())
+        if unix_socket is not None:
+            self.c.setopt(pycurl.UNIX_SOCKET_PATH, unix_socket)
+        self.head_size = 0
+        self.body_size = 0
+        self.chunks = None
+
+    def handle(self, item):
+        """引擎调用的入口
+
+        args:
+            item: 请求来源产生的 (target, url)，可带第三项回调，
+                  在 worker 取到该请求、即将发送时调用（如回放统计延迟）
+        return: (target, Result)，请求失败时 Result 为 None
+        """
+        target, url = item[0], item[1]
+        if len(item) > 2:
+            item[2]()
+        return target, self.get_url(url)
+
+    def set_head_size(self, buf):
+        self.head_size += len(buf)
+
+    def set_body_size(self, buf):
+        self.body_size += len(buf)
+        if self.chunks is not None:
+            self.chunks.append(buf)
+
+    def clear_var(self):
+        """恢复size变量
+        """
+        self.body_size = 0
+        self.head_size = 0
+
+    def get_url(self, url):
+        """get result from url
+
+        args:
+            url: string url
+        """
+        pycurl = self.pycurl
+        self.c.setopt(pycurl.URL, url)
+        try:
+            self.c.perform()
+        except Exception:
+            traceback.print_exc()
+            self.clear_var()
+            return None
+        else:
+            status = self.c.getinfo(pycurl.RESPONSE_CODE)
+            if self.validate:
+                html_size = self.body_size
+                head_size = self.head_size
+                self.clear_var()
+            else:
+                html_size = int(self.c.getinfo(pycurl.SIZE_DOWNLOAD))
+                head_size = self.c.getinfo(pycurl.HEADER_SIZE)
+            total_size = html_size + head_size
+
+            time_dict = {}
+            time_dict["total_time"] = self.c.getinfo(pycurl.TOTAL_TIME)
+            time_dict["connect_time"] = self.c.getinfo(pycurl.CONNECT_TIME)
+            time_dict["wait_time"] = self.c.getinfo(pycurl.STARTTRANSFER_TIME)
+            time_dict["proc_time"] = time_dict["total_time"] - time_dict["connect_time"]
+            return Result(time_dict, total_size, html_size, status)
@@ -0,0 +1,64 @@
+#coding=utf8
+from __future__ import division
+import math
+import random
+import unittest
+
+from abcore.compare import bootstrap_ci, mann_whitney, percentile
+
+
+class MannWhitneyTest(unittest.TestCase):
+
+    def test_separated_samples(self):
+        u, z, p = mann_whitney([1, 2, 3], [4, 5, 6])
+        self.assertEqual(u, 0)
+        self.assertAlmostEqual(z, -4.5 / math.sqrt(5.25))
+        self.assertAlmostEqual(p, 0.049535, places=5)
+
+    def test_ties(self):
+        # 三个 2 并列取平均秩 3，并列修正 (3**3 - 3) / (6 * 5)
+        u, z, p = mann_whitney([1, 2, 2], [2, 3, 4])
+        self.assertEqual(u, 1)
+        self.assertAlmostEqual(z, -3.5 / math.sqrt(0.75 * (7 - 24 / 30)))
+
+    def test_identical_samples(self):
+        self.assertEqual(mann_whitney([1, 1], [1, 1]), (2, 0.0, 1.0))
+
+    def test_symmetric(self):
+        a, b = [1, 3, 5, 7], [2, 4, 6, 9]
+        _, z1, p1 = mann_whitney(a, b)
+        _, z2, p2 = mann_whitney(b, a)
+        self.assertAlmostEqual(z1, -z2)
+        self.assertAlmostEqual(p1, p2)
+
+
+class BootstrapTest(unittest.TestCase):
+
+    def test_percentile(self):
+        data = range(100)
+        self.assertEqual(percentile(data, 50), 50)
+        self.assertEqual(percentile(data, 100), 99)
+
+    def test_interval_contains_diff(self):
+        rand = random.Random(1)
+        a = [rand.gauss(10, 1) for _ in xrange(300)]
+        b = [rand.gauss(12, 1) for _ in xrange(300)]
+        intervals = bootstrap_ci(a, b, (50, 99), iterations=200)
+        diff, low, high = intervals[50]
+        self.assertTrue(low <= diff <= high)
+        self.assertTrue(1.5 < low and high < 2.5)
+        self.assertEqual(sorted(intervals), [50, 99])
+
+    def test_subsampling_keeps_interval_width(self):
+        rand = random.Random(2)
+        a = [rand.gauss(10, 1) for _ in xrange(4000)]
+        b = [rand.gauss(10, 1) for _ in xrange(4000)]
+        full = bootstrap_ci(a, b, (50,), iterations=200)[50]
+        sub = bootstrap_ci(a, b, (50,), iterations=200, max_samples=1000)[50]
+        self.assertEqual(full[0], sub[0])
+        width_full, width_sub = full[2] - full[1], sub[2] - sub[1]
+        self.assertTrue(0.5 < width_sub / width_full < 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#coding=utf8
+import threading
+import time
+import unittest
+
+from abcore.engines.gevent_engine import GeventEngine
+from abcore.engines.thread_engine import ThreadEngine
+from abcore.producer import interleave
+from abcore.stats import Result, ResultStats
+
+try:
+    import gevent
+except ImportError:
+    gevent = None
+
+DELAY = 0.05
+
+
+class StubWorker(object):
+    """不发网络请求，sleep DELAY 后返回结果，finished 为完成时刻"""
+
+    def __init__(self, sleep):
+        self.sleep = sleep
+
+    def handle(self, item):
+        self.sleep(DELAY)
+        time_dict = dict(total_time=DELAY, connect_time=0, wait_time=0, proc_time=DELAY)
+        result = Result(time_dict, 0, 0, 200)
+        result.finished = time.time()
+        return item[0], result
+
+
+class EngineTests(object):
+    """各引擎共用的限时与停止测试，子类提供 engine_cls 和 stop_later"""
+
+    def make_engine(self):
+        engine_cls = self.engine_cls
+
+        class StubEngine(engine_cls):
+            def new_worker(self):
+                return StubWorker(self.sleep)
+
+        return StubEngine(c=4)
+
+    def run_engine(self, engine, duration=None):
+        stats = ResultStats()
+        start = time.time()
+        engine.run(interleave([['http://stub/']], None), [stats], duration=duration)
+        return stats, start, time.time()
+
+    def test_duration(self):
+        engine = self.make_engine()
+        stats, start, end = self.run_engine(engine, duration=0.3)
+        self.assertLess(end - start, 0.3 + 0.5)
+        self.assertIsNotNone(engine.stopped_at)
+        self.assertLessEqual(engine.stopped_at, engine.deadline)
+        self.assertGreater(engine.stopped_at, start)
+        self.assertTrue(stats.results)
+        self.assertTrue(all(r.finished <= engine.deadline for r in stats.results))
+
+    def test_stop(self):
+        engine = self.make_engine()
+        self.stop_later(engine, 0.2)
+        stats, start, end = self.run_engine(engine)
+        self.assertLess(end - start, 0.2 + 0.5)
+        self.assertAlmostEqual(engine.stopped_at - start, 0.2, delta=0.1)
+        self.assertTrue(stats.results)
+        self.assertTrue(all(r.finished <= engine.stopped_at for r in stats.results))
+
+
+class ThreadEngineTest(EngineTests, unittest.TestCase):
+    engine_cls = ThreadEngine
+
+    def stop_later(self, engine, seconds):
+        timer = threading.Timer(seconds, engine.stop)
+        timer.daemon = True
+        timer.start()
+
+
+@unittest.skipUnless(gevent, 'gevent is not installed')
+class GeventEngineTest(EngineTests, unittest.TestCase):
+    engine_cls = GeventEngine
+
+    def stop_later(self, engine, seconds):
+        gevent.spawn_later(seconds, engine.stop)
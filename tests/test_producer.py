@@ -0,0 +1,120 @@
+#coding=utf8
+from __future__ import division
+import os
+import random
+import tempfile
+import time
+import unittest
+from collections import Counter
+
+from abcore.producer import (MAX_RING_SIZE, UrlParam, ZipfSampler, expand,
+                             interleave, template_fields)
+
+
+class UrlParamTest(unittest.TestCase):
+
+    def test_parse(self):
+        param = UrlParam.parse('id=zipf:10:20:1.2')
+        self.assertEqual((param.name, param.kind, param.start, param.end, param.s),
+                         ('id', 'zipf', 10, 20, 1.2))
+        self.assertEqual(param.keys, 11)
+        self.assertEqual(UrlParam.parse('id=range:1:5').length, 5)
+        self.assertEqual(UrlParam.parse('id=uniform:1:5').length, None)
+
+    def test_bad_specs(self):
+        for option in ('id', '=range:1:2', 'id=foo:1:2', 'id=range:3:1',
+                       'id=uniform:a:b', 'id=range', 'id=zipf:1:9:0'):
+            self.assertRaises(ValueError, UrlParam.parse, option)
+
+    def test_file(self):
+        fd, path = tempfile.mkstemp()
+        try:
+            os.write(fd, 'a\nb\n\nc\n')
+            os.close(fd)
+            param = UrlParam.parse('v=file:' + path)
+            self.assertEqual(param.values(5, random.Random()), ['a', 'b', 'c', 'a', 'b'])
+        finally:
+            os.remove(path)
+
+    def test_range_and_uniform(self):
+        rand = random.Random(0)
+        self.assertEqual(UrlParam.parse('i=range:5:7').values(5, rand), [5, 6, 7, 5, 6])
+        values = UrlParam.parse('i=uniform:1:3').values(1000, rand)
+        self.assertEqual(set(values), set([1, 2, 3]))
+
+
+class ZipfTest(unittest.TestCase):
+
+    def test_distribution(self):
+        sampler = ZipfSampler(100, 1.0, random.Random(0))
+        counts = Counter(sampler.sample() for _ in xrange(20000))
+        harmonic = sum(1 / k for k in xrange(1, 101))
+        self.assertTrue(min(counts) >= 1 and max(counts) <= 100)
+        self.assertAlmostEqual(counts[1] / 20000, 1 / harmonic, delta=0.01)
+        self.assertAlmostEqual(counts[2] / 20000, 0.5 / harmonic, delta=0.01)
+
+    def test_huge_range_is_fast(self):
+        start = time.time()
+        values = UrlParam.parse('id=zipf:1:100000000').values(1000, random.Random(0))
+        self.assertTrue(time.time() - start < 1)
+        self.assertTrue(all(1 <= v <= 100000000 for v in values))
+
+
+class ExpandTest(unittest.TestCase):
+
+    def test_plain_url(self):
+        self.assertEqual(expand('http://x/', {}), ['http://x/'])
+        params = {'a': UrlParam.parse('a=range:1:2')}
+        self.assertEqual(template_fields('http://x/{a}/{b}', params), set(['a', 'b']))
+
+    def test_literal_braces(self):
+        params = {'id': UrlParam.parse('id=range:1:2')}
+        for url in ('http://x/q?f={}', 'http://x/q?f={"a":1}', 'http://x/q?f={',
+                    'http://x/{id}'):
+            self.assertEqual(template_fields(url, {}), set())
+            self.assertEqual(expand(url, {}), [url])
+        self.assertEqual(template_fields('http://x/q?f={', params), set())
+        self.assertEqual(expand('http://x/{id}?f={{}}', params, n=2),
+                         ['http://x/1?f={}', 'http://x/2?f={}'])
+
+    def test_bad_template(self):
+        params = {'id': UrlParam.parse('id=range:1:2')}
+        self.assertRaises(ValueError, template_fields, 'http://x/{id}?f={', params)
+        self.assertRaises(ValueError, expand, 'http://x/{id}?f={}', params)
+
+    def test_missing_param(self):
+        params = {'id': UrlParam.parse('id=range:1:2')}
+        self.assertRaises(ValueError, expand, 'http://x/{id}/{page}', params)
+
+    def test_ring_size_follows_n(self):
+        params = {'id': UrlParam.parse('id=uniform:1:10000000')}
+        ring = expand('http://x/{id}', params, n=50000)
+        self.assertEqual(len(ring), 50000)
+        self.assertTrue(len(set(ring)) > 49000)
+        self.assertEqual(len(expand('http://x/{id}', params, size=7)), 7)
+
+    def test_ring_size_capped(self):
+        params = {'id': UrlParam.parse('id=range:1:3')}
+        self.assertEqual(len(expand('http://x/{id}', params, n=MAX_RING_SIZE * 2)),
+                         MAX_RING_SIZE)
+
+    def test_same_seed_same_ring(self):
+        params = {'id': UrlParam.parse('id=zipf:1:1000')}
+        self.assertEqual(expand('http://a/{id}', params, n=100),
+                         [u.replace('http://b/', 'http://a/')
+                          for u in expand('http://b/{id}', params, n=100)])
+
+
+class InterleaveTest(unittest.TestCase):
+
+    def test_abba(self):
+        self.assertEqual(list(interleave([['a'], ['b1', 'b2']], 3)),
+                         [(0, 'a'), (1, 'b1'), (1, 'b2'), (0, 'a'), (0, 'a'), (1, 'b1')])
+
+    def test_unbounded(self):
+        items = interleave([['a']], None)
+        self.assertEqual([next(items) for _ in xrange(5)], [(0, 'a')] * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#coding=utf8
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from abcore.replay import LATE_THRESHOLD, TraceReplay, parse_clf_time, parse_line
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_clf_time_zones(self):
+        utc = parse_clf_time('10/Oct/2000:20:55:36 +0000')
+        self.assertEqual(utc, 971211336)
+        self.assertEqual(parse_clf_time('10/Oct/2000:13:55:36 -0700'), utc)
+        self.assertEqual(parse_clf_time('11/Oct/2000:02:25:36 +0530'), utc)
+        self.assertEqual(parse_clf_time('10/Oct/2000:20:55:36'), utc)
+
+    def test_clf_line(self):
+        line = ('127.0.0.1 - frank [10/Oct/2000:13:55:36 -0700] '
+                '"GET /a?b=1 HTTP/1.0" 200 2326 "-" "curl/7.0"\n')
+        self.assertEqual(parse_line(line), (971211336, 'GET', '/a?b=1'))
+
+    def test_json_line(self):
+        self.assertEqual(parse_line('{"ts": 1.5, "path": "/x", "method": "POST"}'),
+                         (1.5, 'POST', '/x'))
+        self.assertEqual(parse_line('{"timestamp": "2", "url": "/y"}'), (2.0, 'GET', '/y'))
+
+    def test_bad_lines(self):
+        for line in ('', 'garbage', '{"url": "/x"}', '{"timestamp": "x", "url": "/x"}',
+                     '{broken', '[1, 2]',
+                     '127.0.0.1 - - [bad date] "GET / HTTP/1.0" 200 1'):
+            self.assertEqual(parse_line(line), None)
+
+
+class TraceReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, lines, opener=open):
+        path = os.path.join(self.dir, name)
+        with opener(path, 'wb') as f:
+            f.write(''.join(line + '\n' for line in lines))
+        return path
+
+    def test_requests_and_skipped(self):
+        path = self.write('trace.jsonl', [
+            '{"timestamp": 1, "url": "http://h/a"}',
+            '{"timestamp": 2, "url": "/rel"}',
+            '{"timestamp": 3, "url": "http://h/b", "method": "POST"}',
+            'garbage',
+            '{"timestamp": 4, "url": "http://h/c"}',
+        ])
+        replay = TraceReplay(path)
+        self.assertEqual(list(replay.requests()), [(1.0, 'http://h/a'), (4.0, 'http://h/c')])
+        self.assertEqual(replay.skipped, 3)
+
+    def test_base_url(self):
+        path = self.write('access.log.gz', [
+            '127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET /a HTTP/1.0" 200 1',
+        ], opener=gzip.open)
+        self.assertRaises(ValueError, TraceReplay, path)
+        replay = TraceReplay(path, 'http://h:8080/')
+        self.assertEqual([url for _, url in replay.requests()], ['http://h:8080/a'])
+
+    def test_no_requests(self):
+        path = self.write('empty.jsonl', ['garbage'])
+        self.assertRaises(ValueError, TraceReplay, path)
+        self.assertRaises(ValueError, TraceReplay, path, speed=0)
+
+    def test_items_pacing_and_lag(self):
+        path = self.write('trace.jsonl', [
+            '{"timestamp": 10, "url": "http://h/a"}',
+            '{"timestamp": 12, "url": "http://h/b"}',
+            '{"timestamp": 16, "url": "http://h/c"}',
+        ])
+        replay = TraceReplay(path, speed=2)
+        sleeps = []
+        items = list(replay.items(n=2, sleep=sleeps.append))
+        self.assertEqual([(target, url) for target, url, _ in items],
+                         [(0, 'http://h/a'), (0, 'http://h/b')])
+        self.assertEqual(len(sleeps), 1)
+        self.assertAlmostEqual(sleeps[0], 1.0, delta=0.05)
+
+        # 第一条立即到期，worker 晚取到就计为 late
+        items[0][2]()
+        self.assertEqual(replay.late, 0)
+        time.sleep(LATE_THRESHOLD * 3)
+        items[0][2]()
+        self.assertEqual(replay.late, 1)
+        self.assertTrue(replay.max_lag >= LATE_THRESHOLD * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
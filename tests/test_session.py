@@ -0,0 +1,136 @@
+#coding=utf8
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from abcore.session import SessionScript, Step, VirtualUser, parse_think, render
+from abcore.stats import Result
+
+
+class ParseThinkTest(unittest.TestCase):
+
+    def test_empty(self):
+        for spec in (None, '', 0):
+            self.assertEqual(parse_think(spec), None)
+
+    def test_constant(self):
+        rand = random.Random(0)
+        self.assertEqual(parse_think(0.5)(rand), 0.5)
+        self.assertEqual(parse_think('1.5')(rand), 1.5)
+
+    def test_uniform(self):
+        think = parse_think('uniform:0.1:0.2')
+        rand = random.Random(0)
+        self.assertTrue(all(0.1 <= think(rand) <= 0.2 for _ in xrange(100)))
+
+    def test_exp(self):
+        think = parse_think('exp:0.5')
+        rand = random.Random(0)
+        mean = sum(think(rand) for _ in xrange(5000)) / 5000
+        self.assertAlmostEqual(mean, 0.5, delta=0.05)
+
+    def test_bad(self):
+        for spec in ('fast', 'uniform:1', 'exp:0', 'normal:1:2'):
+            self.assertRaises(ValueError, parse_think, spec)
+
+
+class RenderTest(unittest.TestCase):
+
+    def test_substitute(self):
+        self.assertEqual(render(u'Bearer {token}', {'token': 'abc'}, set(['token'])),
+                         'Bearer abc')
+
+    def test_other_braces_untouched(self):
+        body = '{"user": "bench", "tags": {x}}'
+        self.assertEqual(render(body, {}, set(['token'])), body)
+
+    def test_not_extracted_yet(self):
+        self.assertRaises(ValueError, render, '{token}', {}, set(['token']))
+
+
+class SessionScriptTest(unittest.TestCase):
+
+    def load(self, spec):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        try:
+            os.write(fd, json.dumps(spec))
+            os.close(fd)
+            return SessionScript.load(path)
+        finally:
+            os.remove(path)
+
+    def test_load(self):
+        script = self.load({
+            'base_url': 'http://127.0.0.1:8080',
+            'setup': [{'name': 'login', 'method': 'post', 'url': '/login',
+                       'data': '{"user": "bench"}',
+                       'extract': {'token': '"token": "([^"]+)"'}}],
+            'steps': [{'url': '/me', 'headers': ['Authorization: Bearer {token}'],
+                       'think': 'exp:0.1'}],
+        })
+        self.assertEqual(script.setup_count, 1)
+        self.assertEqual(script.names, set(['token']))
+        self.assertTrue(script.needs_body)
+        login, me = script.steps
+        self.assertEqual((login.method, login.url, login.setup),
+                         ('POST', 'http://127.0.0.1:8080/login', True))
+        self.assertEqual((me.name, me.method, me.setup), ('/me', 'GET', False))
+
+    def test_misspelled_variable(self):
+        self.assertRaises(ValueError, self.load, {
+            'setup': [{'url': 'http://h/login', 'extract': {'token': '(.+)'}}],
+            'steps': [{'url': 'http://h/me', 'headers': ['Authorization: {tokn}']}],
+        })
+
+    def test_bad_scripts(self):
+        for spec in ([], {'steps': []}, {'steps': [{'name': 'x'}]},
+                     {'steps': [{'url': 'ftp://h/'}]},
+                     {'steps': [{'url': 'http://h/', 'extract': {'a': '('}}]}):
+            self.assertRaises(ValueError, self.load, spec)
+
+
+class FakeCurl(object):
+    """VirtualUser 只用到的 pycurl 常量和 curl handle"""
+    COOKIEFILE = POSTFIELDS = HTTPGET = CUSTOMREQUEST = HTTPHEADER = 0
+
+    def setopt(self, option, value):
+        pass
+
+
+class FakeWorker(object):
+    """记录请求的 url，每次返回 200"""
+
+    def __init__(self):
+        self.c = self.pycurl = FakeCurl()
+        self.chunks = None
+        self.urls = []
+
+    def get_url(self, url):
+        self.urls.append(url)
+        if self.chunks is not None:
+            self.chunks.append('"token": "abc"')
+        time_dict = dict(total_time=0, connect_time=0, wait_time=0, proc_time=0)
+        return Result(time_dict, 0, 0, 200)
+
+
+class VirtualUserTest(unittest.TestCase):
+
+    def test_steps_and_steady(self):
+        script = SessionScript(
+            [Step({'url': 'http://h/login', 'extract': {'token': '"token": "(\\w+)"'}},
+                  setup=True)],
+            [Step({'url': 'http://h/a/{token}'}), Step({'url': 'http://h/b'})])
+        worker = FakeWorker()
+        steady = []
+        user = VirtualUser(worker, script, None, lambda: steady.append(len(worker.urls)))
+        targets = [user.handle(None)[0] for _ in xrange(5)]
+        self.assertEqual(targets, [0, 1, 2, 1, 2])
+        self.assertEqual(worker.urls[:3], ['http://h/login', 'http://h/a/abc', 'http://h/b'])
+        # 只在第一个稳态步骤发出前调用一次
+        self.assertEqual(steady, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()